@@ -0,0 +1,311 @@
+"""
+Cross-engine consistency harness for the firing rules.
+
+The same mechanics are implemented by several engines: the analytic magazine
+cycle in calculate_uptime, the shot-by-shot simulate_ammo_consumption, the
+frame-based animation rules, and optimized replacements such as
+calculate_uptime_batch and simulate_squads. This runs every registered engine
+over randomized and edge-case inputs, compares how many shots each one fires
+within a time horizon, shrinks divergences to minimal reproducing inputs and
+reports the relative speed of each engine.
+
+    python consistency.py --cases 500 --seed 0
+
+Exits non-zero when an optimized engine disagrees with the engine it replaces.
+"""
+import argparse
+import itertools
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from streamlit_app import (advance_animation, animation_setup, calculate_uptime,
+                           calculate_uptime_batch, simulate_ammo_consumption,
+                           simulate_squads, start_animation_state)
+from weapons import WEAPON_CLASSES, get_weapon_class
+
+REFERENCE_ENGINE = "simulation"
+ANIMATION_FRAME_TIME = 1 / 60  # Seconds of simulation per animation frame
+
+ENGINES = {}
+
+def register_engine(name, run, replaces=None):
+    """
+    Adds an engine to the harness. `run` takes a list of cases and returns the
+    number of shots fired within each case's horizon. An optimized engine names
+    the engine it `replaces` and must agree with it exactly.
+    """
+    ENGINES[name] = {'run': run, 'replaces': replaces}
+
+
+def _shots_from_cycle(effective_shots, total_time, kernel, fire_rate, horizon):
+    """
+    Shots started before `horizon` when every magazine fires effective_shots
+    and then reloads, with a full cycle taking total_time.
+    """
+    cycles = int(horizon // total_time)
+    remaining = horizon - cycles * total_time
+    partial = min(effective_shots, math.ceil(kernel.shots_fired(remaining, fire_rate)))
+    return cycles * effective_shots + partial
+
+def run_uptime(cases):
+    shots = []
+    for case in cases:
+        results = calculate_uptime(case['total_ammo'], case['fire_rate'], case['reload_time'],
+                                   bastion_cube=case['bastion_cube'], resilience=case['resilience'],
+                                   ammo_bonus=case['ammo_bonus'], weapon_class=case['weapon_class'])
+        shots.append(_shots_from_cycle(results['effective_ammo'], results['total_time'],
+                                       get_weapon_class(case['weapon_class']),
+                                       case['fire_rate'], case['horizon']))
+    return shots
+
+def run_uptime_batch(cases):
+    shots = np.zeros(len(cases), dtype=np.int64)
+    weapon_classes = np.array([case['weapon_class'] for case in cases])
+    columns = {name: np.array([case[name] for case in cases])
+               for name in ('total_ammo', 'fire_rate', 'reload_time', 'bastion_cube',
+                            'resilience', 'ammo_bonus', 'horizon')}
+
+    # One vectorized call per weapon class, mirroring _shots_from_cycle
+    for weapon_class in np.unique(weapon_classes):
+        rows = weapon_classes == weapon_class
+        kernel = get_weapon_class(str(weapon_class))
+        fire_rate = columns['fire_rate'][rows]
+        horizon = columns['horizon'][rows]
+        results = calculate_uptime_batch(
+            columns['total_ammo'][rows], fire_rate, columns['reload_time'][rows],
+            bastion_cube=columns['bastion_cube'][rows], resilience=columns['resilience'][rows],
+            ammo_bonus=columns['ammo_bonus'][rows], weapon_class=kernel
+        )
+        cycles = horizon // results['total_time']
+        remaining = horizon - cycles * results['total_time']
+        partial = np.minimum(results['effective_ammo'],
+                             np.ceil(kernel.shots_fired_batch(remaining, fire_rate)))
+        shots[rows] = cycles * results['effective_ammo'] + partial
+    return shots.tolist()
+
+def run_squads(cases):
+    shots = np.zeros(len(cases), dtype=np.int64)
+    horizons = np.array([case['horizon'] for case in cases])
+    # Every case is a one-unit squad; one batch per horizon
+    for horizon in np.unique(horizons):
+        rows = np.flatnonzero(horizons == horizon)
+        columns = [np.array([[cases[row][name]] for row in rows])
+                   for name in ('total_ammo', 'fire_rate', 'reload_time', 'weapon_class',
+                                'bastion_cube', 'resilience', 'ammo_bonus')]
+        shots[rows] = simulate_squads(*columns, simulation_time=float(horizon))['shots'][:, 0]
+    return shots.tolist()
+
+def run_simulation(cases):
+    return [simulate_ammo_consumption(case['total_ammo'], case['fire_rate'], case['reload_time'],
+                                      bastion_cube=case['bastion_cube'],
+                                      resilience=case['resilience'],
+                                      ammo_bonus=case['ammo_bonus'],
+                                      simulation_time=case['horizon'],
+                                      weapon_class=case['weapon_class'])[2]
+            for case in cases]
+
+def run_animation(cases):
+    shots = []
+    for case in cases:
+        kernel = get_weapon_class(case['weapon_class'])
+        max_ammo, reload_time = animation_setup(case['total_ammo'], case['reload_time'],
+                                                case['resilience'], case['ammo_bonus'])
+        state = start_animation_state(max_ammo, kernel)
+        while state['simulation_time'] < case['horizon']:
+            advance_animation(state, ANIMATION_FRAME_TIME, kernel, case['fire_rate'], max_ammo,
+                              reload_time, case['bastion_cube'])
+        shots.append(state['total_shots'])
+    return shots
+
+register_engine("simulation", run_simulation)
+register_engine("uptime", run_uptime)
+register_engine("uptime_batch", run_uptime_batch, replaces="uptime")
+register_engine("squads", run_squads, replaces="uptime")
+register_engine("animation", run_animation)
+
+
+def edge_cases():
+    """
+    Boundary inputs: magazines around the Bastion Cube and MG wind-up
+    thresholds, truncating ammo bonuses and every equipment combination.
+    """
+    cases = []
+    for weapon_class, total_ammo, (bastion_cube, resilience), ammo_bonus in itertools.product(
+            WEAPON_CLASSES, (1, 9, 10, 11, 47, 48, 300),
+            ((False, 0), (True, 0), (False, 29.69), (True, 29.69)), (0, 33.3)):
+        cases.append({
+            'total_ammo': total_ammo, 'fire_rate': 12.0, 'reload_time': 1.5,
+            'weapon_class': weapon_class, 'bastion_cube': bastion_cube,
+            'resilience': resilience, 'ammo_bonus': ammo_bonus, 'horizon': 30.0,
+        })
+    return cases
+
+def random_cases(count, rng):
+    classes = list(WEAPON_CLASSES)
+    cases = []
+    for _ in range(count):
+        cases.append({
+            'total_ammo': rng.randint(1, 400),
+            'fire_rate': round(rng.uniform(0.5, 60), 1),
+            'reload_time': round(rng.uniform(0.1, 3), 2),
+            'weapon_class': rng.choice(classes),
+            'bastion_cube': rng.random() < 0.5,
+            'resilience': rng.choice((0, 0, 29.69, round(rng.uniform(0, 50), 2))),
+            'ammo_bonus': rng.choice((0, 0, rng.randint(1, 200), round(rng.uniform(0, 200), 1))),
+            'horizon': float(rng.choice((10, 30, 60))),
+        })
+    return cases
+
+
+def _diverges(name, reference, case, rtol, atol):
+    expected = ENGINES[reference]['run']([case])[0]
+    actual = ENGINES[name]['run']([case])[0]
+    return abs(actual - expected) > max(atol, rtol * abs(expected))
+
+def _simpler_values(field, value):
+    """
+    Candidate replacements for one input field, simplest first.
+    """
+    if field == 'weapon_class':
+        return ["Assault Rifle"]
+    if field == 'bastion_cube':
+        return [False]
+    if field in ('resilience', 'ammo_bonus'):
+        return [0, round(value)]
+    if field == 'total_ammo':
+        return [1, 10, value // 2, value - 1]
+    if field == 'fire_rate':
+        return [1.0, 10.0, float(round(value))]
+    if field == 'reload_time':
+        return [1.0, float(round(value, 1))]
+    if field == 'horizon':
+        return [1.0, 10.0, float(round(value / 2))]
+    return []
+
+def _complexity(field, value):
+    """
+    Ordering used by shrink: fewer decimals first, then smaller values.
+    """
+    if field == 'weapon_class':
+        return (0, value != "Assault Rifle")
+    if isinstance(value, bool):
+        return (0, value)
+    return (len(f"{value:g}".partition('.')[2]), value)
+
+def shrink(name, reference, case, rtol, atol):
+    """
+    Greedily simplifies a diverging case while it keeps diverging.
+    """
+    case = dict(case)
+    changed = True
+    while changed:
+        changed = False
+        for field in case:
+            for value in _simpler_values(field, case[field]):
+                if (_complexity(field, value) >= _complexity(field, case[field])
+                        or (field in ('total_ammo', 'fire_rate', 'horizon') and value <= 0)):
+                    continue
+                candidate = dict(case, **{field: value})
+                if _diverges(name, reference, candidate, rtol, atol):
+                    case = candidate
+                    changed = True
+                    break
+    return case
+
+def compare(cases, rtol=0.01, atol=2, engines=None, max_examples=3):
+    """
+    Runs every engine over the cases; an optimized engine's replaced engine
+    must be among them. Returns {engine: (seconds, shots)},
+    {engine: number of diverging cases} and a list of divergences, each a dict
+    with the engine, the engine it was checked against, and the shrunk inputs
+    with both results. At most max_examples cases per engine are shrunk.
+    """
+    engines = engines or list(ENGINES)
+    timings = {}
+    for name in engines:
+        start = time.perf_counter()
+        shots = ENGINES[name]['run'](cases)
+        timings[name] = (time.perf_counter() - start, shots)
+
+    counts = {}
+    divergences = []
+    for name in engines:
+        # Optimized engines must match what they replace; the rest are compared
+        # with the reference simulation using a tolerance
+        reference = ENGINES[name]['replaces'] or REFERENCE_ENGINE
+        strict = ENGINES[name]['replaces'] is not None
+        if strict and reference not in timings:
+            raise ValueError(f"Engine {name} replaces {reference}, which was not run")
+        if name == reference or reference not in timings:
+            continue
+        case_rtol, case_atol = (0, 0) if strict else (rtol, atol)
+        diverging = [case for case, expected, actual
+                     in zip(cases, timings[reference][1], timings[name][1])
+                     if abs(actual - expected) > max(case_atol, case_rtol * abs(expected))]
+        counts[name] = len(diverging)
+        seen = set()
+        for case in diverging[:max_examples]:
+            minimal = shrink(name, reference, case, case_rtol, case_atol)
+            key = tuple(sorted(minimal.items()))
+            if key in seen:
+                continue
+            seen.add(key)
+            divergences.append({
+                'engine': name,
+                'reference': reference,
+                'strict': strict,
+                'case': minimal,
+                'expected': ENGINES[reference]['run']([minimal])[0],
+                'actual': ENGINES[name]['run']([minimal])[0],
+            })
+    return timings, counts, divergences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=300, help="Number of random cases")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--rtol", type=float, default=0.01,
+                        help="Relative shot-count tolerance against the reference")
+    parser.add_argument("--atol", type=int, default=2,
+                        help="Absolute shot-count tolerance against the reference")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES),
+                        help="Engines to run (default: all)")
+    parser.add_argument("--examples", type=int, default=3,
+                        help="Diverging cases to shrink and show per engine")
+    args = parser.parse_args(argv)
+
+    cases = edge_cases() + random_cases(args.cases, random.Random(args.seed))
+    engines = args.engines or list(ENGINES)
+    if REFERENCE_ENGINE not in engines:
+        engines.insert(0, REFERENCE_ENGINE)
+    # An optimized engine is only checked against the engine it replaces
+    for name in list(engines):
+        replaced = ENGINES[name]['replaces']
+        while replaced is not None and replaced not in engines:
+            engines.insert(engines.index(name), replaced)
+            replaced = ENGINES[replaced]['replaces']
+    timings, counts, divergences = compare(cases, args.rtol, args.atol, engines, args.examples)
+
+    print(f"{len(cases)} cases, reference engine: {REFERENCE_ENGINE}\n")
+    print(f"{'Engine':<16}{'cases/s':>12}{'speed':>10}{'divergences':>14}")
+    reference_time = timings[REFERENCE_ENGINE][0]
+    for name, (seconds, _) in timings.items():
+        count = counts.get(name, "-")
+        print(f"{name:<16}{len(cases) / seconds:>12.0f}{reference_time / seconds:>9.2f}x{count:>14}")
+
+    for divergence in divergences:
+        label = "MISMATCH" if divergence['strict'] else "diverges"
+        inputs = ", ".join(f"{k}={v}" for k, v in divergence['case'].items())
+        print(f"\n{divergence['engine']} {label} from {divergence['reference']}: "
+              f"{divergence['actual']} vs {divergence['expected']} shots\n  {inputs}")
+
+    return 1 if any(d['strict'] for d in divergences) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Columnar export of calculator results to Parquet and Arrow IPC files.
+
+Results are written one record batch at a time, so a producer only ever holds
+one batch of columns in memory instead of building the whole result as a list
+of rows. Every file carries the input parameters and engine version in its
+schema metadata so a notebook can tell how the numbers were produced.
+"""
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FORMATS = {
+    "Parquet": ".parquet",
+    "Arrow IPC": ".arrow",
+}
+
+SWEEP_SCHEMA = pa.schema([
+    ("ammo_bonus", pa.float64()),
+    ("effective_ammo", pa.int64()),
+    ("shooting_time", pa.float64()),
+    ("reload_time", pa.float64()),
+    ("total_time", pa.float64()),
+    ("uptime", pa.float64()),
+])
+
+ROSTER_SCHEMA = pa.schema([
+    ("name", pa.string()),
+    ("base_ammo", pa.int64()),
+    ("fire_rate", pa.float64()),
+    ("reload_time", pa.float64()),
+    ("weapon_class", pa.string()),
+    ("equipment", pa.string()),
+    ("ammo_bonus", pa.float64()),
+    ("effective_ammo", pa.int64()),
+    ("shooting_time", pa.float64()),
+    ("total_time", pa.float64()),
+    ("uptime", pa.float64()),
+])
+
+TRAJECTORY_SCHEMA = pa.schema([
+    ("equipment", pa.string()),
+    ("time", pa.float64()),
+    ("ammo", pa.int64()),
+])
+
+
+def _schema_with_metadata(schema, parameters, engine_version):
+    return schema.with_metadata({
+        b"engine_version": str(engine_version).encode(),
+        b"parameters": json.dumps(parameters, sort_keys=True).encode(),
+    })
+
+
+def write_batches(sink, schema, batches, parameters, engine_version, fmt="Parquet"):
+    """
+    Stream column batches into a Parquet or Arrow IPC file.
+
+    `batches` is an iterable of dicts mapping column name to a list (or array)
+    of values; each one becomes a record batch. `sink` is a path or a writable
+    binary file object. Returns the number of rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    schema = _schema_with_metadata(schema, parameters, engine_version)
+    if fmt == "Parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+
+    rows = 0
+    try:
+        for columns in batches:
+            batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+            if batch.num_rows:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def read_metadata(source):
+    """
+    Return (engine_version, parameters) stored in an exported file.
+
+    `source` is a path or a seekable binary file object.
+    """
+    try:
+        schema = pq.read_schema(source)
+    except pa.ArrowInvalid:
+        if isinstance(source, str):
+            with pa.memory_map(source) as f:
+                schema = pa.ipc.open_file(f).schema
+        else:
+            source.seek(0)
+            schema = pa.ipc.open_file(source).schema
+    metadata = schema.metadata or {}
+    return (metadata.get(b"engine_version", b"").decode(),
+            json.loads(metadata.get(b"parameters", b"{}")))
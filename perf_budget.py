@@ -0,0 +1,125 @@
+"""
+Startup and rerun budget check for the calculator app.
+
+Measures how long a fresh interpreter takes to import the app module and how
+long a full script rerun takes, with and without the on-demand charts, and
+exits non-zero when any of them goes over its budget or when a module that
+should only be loaded on demand (matplotlib, pyarrow) is pulled in at import
+time. Run it from the repository root:
+
+    python perf_budget.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_FILE = "streamlit_app.py"
+APP_MODULE = "streamlit_app"
+
+# Budgets in seconds, generous enough for a cold container. They catch gross
+# slowdowns only; an eager matplotlib import (~0.5s) still fits, and is caught
+# by the DEFERRED_MODULES check instead
+IMPORT_BUDGET = 1.5
+RERUN_BUDGET = 0.5
+CHARTS_RERUN_BUDGET = 1.5  # Rerun with the Breakpoints and Squad charts shown
+
+# Toggles switched on for the charts rerun sample
+CHART_TOGGLES = ["bp_show", "squad_show"]
+
+# Modules that must not be loaded just by importing the app
+DEFERRED_MODULES = ["matplotlib", "matplotlib.pyplot", "pyarrow"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed,
+                  "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(samples=3):
+    """
+    Import the app in fresh interpreters and return (best time, eagerly loaded modules).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = IMPORT_PROBE.format(module=APP_MODULE, deferred=DEFERRED_MODULES)
+    timings = []
+    loaded = []
+    for _ in range(samples):
+        out = subprocess.run([sys.executable, "-c", code], cwd=here,
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result["elapsed"])
+        loaded = result["loaded"]
+    # Best of N filters out noise from the rest of the machine
+    return min(timings), loaded
+
+
+def measure_rerun(samples=5, toggles=()):
+    """
+    Run the app script headlessly and return the median time of a warm rerun,
+    with the given toggles switched on.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    at = AppTest.from_file(os.path.join(here, APP_FILE), default_timeout=30)
+    at.run()
+    for key in toggles:
+        at.toggle(key=key).set_value(True)
+    at.run()  # First runs pay for module caches, not counted
+    if at.exception:
+        raise RuntimeError(f"App raised during run: {at.exception}")
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET,
+                        help="Maximum cold import time in seconds")
+    parser.add_argument("--rerun-budget", type=float, default=RERUN_BUDGET,
+                        help="Maximum median rerun time in seconds")
+    parser.add_argument("--charts-rerun-budget", type=float, default=CHARTS_RERUN_BUDGET,
+                        help="Maximum median rerun time in seconds with the charts shown")
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    import_time, loaded = measure_import()
+    print(f"Cold import: {import_time:.3f}s (budget {args.import_budget:.3f}s)")
+    if import_time > args.import_budget:
+        failures.append("cold import over budget")
+    if loaded:
+        failures.append(f"loaded at import time: {', '.join(loaded)}")
+
+    rerun_time = measure_rerun()
+    print(f"Rerun:       {rerun_time:.3f}s (budget {args.rerun_budget:.3f}s)")
+    if rerun_time > args.rerun_budget:
+        failures.append("rerun over budget")
+
+    charts_time = measure_rerun(toggles=CHART_TOGGLES)
+    print(f"With charts: {charts_time:.3f}s (budget {args.charts_rerun_budget:.3f}s)")
+    if charts_time > args.charts_rerun_budget:
+        failures.append("rerun with charts over budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
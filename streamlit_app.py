@@ -1,7 +1,17 @@
 import streamlit as st
-import matplotlib.pyplot as plt
+import csv
+import io
+import math
 import time
 
+import numpy as np
+
+import tables
+from weapons import WEAPON_CLASSES, get_weapon_class
+
+ENGINE_VERSION = "1.1.0"  # Bump when the calculation rules change
+EXPORT_BATCH_SIZE = 4096  # Rows per record batch when streaming exports
+
 # Import the calculation functions from the original file
 def calculate_effective_ammo_with_bastion(base_ammo):
     """
@@ -21,11 +31,35 @@ def calculate_effective_ammo_with_bastion(base_ammo):
             
     return shots_fired
 
+def calculate_effective_ammo_with_bastion_batch(base_ammo):
+    """
+    Vectorized calculate_effective_ammo_with_bastion.
+    
+    After 10q + r shots (r < 10) a magazine has used 6q + r ammo, so the last
+    shot is in the first block of ten whose best case (6q + 9) covers base_ammo.
+    """
+    base_ammo = np.asarray(base_ammo, dtype=np.int64)
+    blocks = np.maximum(0, -((9 - base_ammo) // 6))  # ceil((base_ammo - 9) / 6)
+    return 10 * blocks + np.maximum(0, base_ammo - 6 * blocks)
+
+def apply_ammo_bonus_batch(total_ammo, ammo_bonus):
+    """
+    Vectorized max ammo after an ammo bonus, truncating like calculate_uptime.
+    """
+    total_ammo = np.asarray(total_ammo, dtype=np.int64)
+    ammo_bonus = np.asarray(ammo_bonus, dtype=np.float64)
+    return np.where(ammo_bonus > 0, (total_ammo * (1 + ammo_bonus / 100)).astype(np.int64), total_ammo)
+
 def calculate_uptime(total_ammo, fire_rate, reload_time, is_mg=False, 
-                     bastion_cube=False, resilience=0, ammo_bonus=0):
+                     bastion_cube=False, resilience=0, ammo_bonus=0,
+                     weapon_class=None):
     """
     Calculate the weapon uptime based on the given parameters.
+    
+    weapon_class is a name from weapons.WEAPON_CLASSES or a WeaponClass; when
+    omitted, is_mg picks between Machine Gun and Assault Rifle.
     """
+    kernel = get_weapon_class(weapon_class, is_mg)
     cover_time = 0.23333  # Cover time during reload in seconds
     
     # Apply ammo bonus
@@ -46,22 +80,8 @@ def calculate_uptime(total_ammo, fire_rate, reload_time, is_mg=False,
     else:
         effective_shots = effective_total_ammo
     
-    # Machine gun wind-up calculation
-    if is_mg:
-        wind_up_time = 2.55  # Wind up time in seconds
-        wind_up_ammo = 47  # Ammo used during wind up
-        
-        # Calculate shooting time
-        if effective_shots <= wind_up_ammo:
-            shooting_time = (effective_shots / wind_up_ammo) * wind_up_time
-        else:
-            remaining_shots = effective_shots - wind_up_ammo
-            remaining_time = remaining_shots / fire_rate
-            shooting_time = wind_up_time + remaining_time
-    else:
-        # Normal weapon calculation
-        shooting_time = effective_shots / fire_rate
-        wind_up_time = 0
+    # Shooting time depends on the weapon class (wind-up, charge, ...)
+    shooting_time = kernel.shooting_time(effective_shots, fire_rate)
     
     # Calculate total magazine cycle time
     total_time = effective_reload_time + shooting_time + cover_time
@@ -79,12 +99,140 @@ def calculate_uptime(total_ammo, fire_rate, reload_time, is_mg=False,
         'base_ammo': total_ammo
     }
 
+def calculate_uptime_batch(total_ammo, fire_rate, reload_time, is_mg=False,
+                           bastion_cube=False, resilience=0, ammo_bonus=0,
+                           weapon_class=None):
+    """
+    Vectorized calculate_uptime. Numeric arguments and bastion_cube may be
+    arrays that broadcast together; the weapon class is shared by the batch.
+    Returns the same keys as calculate_uptime with array values.
+    """
+    kernel = get_weapon_class(weapon_class, is_mg)
+    cover_time = 0.23333  # Cover time during reload in seconds
+    
+    total_ammo = np.asarray(total_ammo, dtype=np.int64)
+    resilience = np.asarray(resilience, dtype=np.float64)
+    bastion_cube = np.asarray(bastion_cube, dtype=bool)
+    
+    # Apply ammo bonus
+    effective_total_ammo = apply_ammo_bonus_batch(total_ammo, ammo_bonus)
+    
+    # Apply resilience to reload time (only if Bastion Cube is not active)
+    effective_reload_time = np.where(
+        (resilience > 0) & ~bastion_cube,
+        reload_time * (1 - resilience / 100),
+        reload_time
+    ).astype(np.float64)
+    
+    effective_shots = np.where(
+        bastion_cube,
+        calculate_effective_ammo_with_bastion_batch(effective_total_ammo),
+        effective_total_ammo
+    )
+    
+    shooting_time = kernel.shooting_time_batch(effective_shots, fire_rate)
+    total_time = effective_reload_time + shooting_time + cover_time
+    uptime = (shooting_time / total_time) * 100
+    
+    return {
+        'uptime': uptime,
+        'shooting_time': shooting_time,
+        'total_time': total_time,
+        'reload_time': effective_reload_time,
+        'cover_time': cover_time,
+        'effective_ammo': effective_shots,
+        'base_ammo': total_ammo
+    }
+
+def solve_bonus_thresholds(total_ammo, max_ammo):
+    """
+    Smallest positive Max Ammo Bonus at which total_ammo truncates up to
+    max_ammo, exact to the float. Arguments broadcast as arrays.
+    """
+    total_ammo, max_ammo = np.broadcast_arrays(np.asarray(total_ammo, dtype=np.int64),
+                                               np.asarray(max_ammo, dtype=np.int64))
+    shape = total_ammo.shape
+    total_ammo, max_ammo = total_ammo.ravel(), max_ammo.ravel()
+    
+    # Max ammo reaches A + k at a bonus of 100k / A; float rounding in the
+    # truncation can move the real threshold by a few ulps either way, so
+    # step only the entries that are still off
+    ammo_bonus = np.maximum((max_ammo - total_ammo) * 100 / total_ammo, np.nextafter(0, 1))
+    active = np.flatnonzero(apply_ammo_bonus_batch(total_ammo, ammo_bonus) < max_ammo)
+    while len(active):
+        ammo_bonus[active] = np.nextafter(ammo_bonus[active], np.inf)
+        active = active[apply_ammo_bonus_batch(total_ammo[active], ammo_bonus[active]) < max_ammo[active]]
+    active = np.arange(len(ammo_bonus))
+    while len(active):
+        lower = np.nextafter(ammo_bonus[active], 0)
+        over = (lower > 0) & (apply_ammo_bonus_batch(total_ammo[active], lower) >= max_ammo[active])
+        active = active[over]
+        ammo_bonus[active] = lower[over]
+    return ammo_bonus.reshape(shape)
+
+def lookup_bonus_thresholds(total_ammo, start_ammo, stop_ammo):
+    """
+    Thresholds for max ammo start_ammo + 1 .. stop_ammo from the shared
+    breakpoint table, or None when it isn't published, was built by another
+    engine version or doesn't cover the range.
+    """
+    table = tables.load_table("breakpoints")
+    if table is None or table['parameters'].get('engine_version') != ENGINE_VERSION:
+        return None
+    offsets = table['columns']['offsets']
+    if not 1 <= total_ammo < len(offsets) or start_ammo < total_ammo:
+        return None
+    first = int(offsets[total_ammo - 1])
+    if stop_ammo - total_ammo > offsets[total_ammo] - first:
+        return None
+    # Copy out of the mapping so results never pin an old generation
+    return np.array(table['columns']['ammo_bonus'][first + start_ammo - total_ammo:
+                                                   first + stop_ammo - total_ammo])
+
+def find_bonus_breakpoints(total_ammo, fire_rate, reload_time, weapon_class=None,
+                           bastion_cube=False, resilience=0, bonus_start=0, bonus_stop=500):
+    """
+    Finds every Max Ammo Bonus in (bonus_start, bonus_stop] where the truncated
+    max ammo, and so effective ammo and uptime, steps up. Bonus values between
+    two breakpoints change nothing.
+    
+    Thresholds are solved directly from the truncation rule instead of sampling
+    the range, so the cost grows with the number of breakpoints, and are read
+    from the shared breakpoint table when one is published. Returns a dict of
+    arrays, one entry per breakpoint.
+    """
+    start_ammo = int(apply_ammo_bonus_batch(total_ammo, bonus_start))
+    stop_ammo = int(apply_ammo_bonus_batch(total_ammo, bonus_stop))
+    max_ammo = np.arange(start_ammo + 1, stop_ammo + 1, dtype=np.int64)
+    ammo_bonus = lookup_bonus_thresholds(total_ammo, start_ammo, stop_ammo)
+    if ammo_bonus is None:
+        ammo_bonus = solve_bonus_thresholds(total_ammo, max_ammo)
+    
+    # Uptime at the start of the range and at every breakpoint, in one batch
+    results = calculate_uptime_batch(total_ammo, fire_rate, reload_time,
+                                     bastion_cube=bastion_cube, resilience=resilience,
+                                     ammo_bonus=np.concatenate(([bonus_start], ammo_bonus)),
+                                     weapon_class=weapon_class)
+    effective_ammo = results['effective_ammo']
+    uptime = results['uptime']
+    
+    return {
+        'ammo_bonus': ammo_bonus,
+        'whole_bonus': np.ceil(ammo_bonus).astype(np.int64),  # Smallest whole % that reaches it
+        'max_ammo': max_ammo,
+        'effective_ammo': effective_ammo[1:],
+        'shots_gained': np.diff(effective_ammo),
+        'uptime': uptime[1:],
+        'uptime_gain': np.diff(uptime),
+    }
+
 def simulate_ammo_consumption(total_ammo, fire_rate, reload_time, is_mg=False, 
                               bastion_cube=False, resilience=0, ammo_bonus=0, 
-                              simulation_time=30):
+                              simulation_time=30, weapon_class=None):
     """
     Simulates ammo consumption over time.
     """
+    kernel = get_weapon_class(weapon_class, is_mg)
     cover_time = 0.23333  # Cover time during reload
     
     # Apply ammo bonus
@@ -106,41 +254,16 @@ def simulate_ammo_consumption(total_ammo, fire_rate, reload_time, is_mg=False,
     current_time = 0
     current_ammo = max_ammo
     shots_fired = 0  # Total shots fired across all magazines
-    shots_in_mag = 0  # Shots fired in current magazine (for Bastion Cube tracking)
+    shots_in_mag = 0  # Shots fired in current magazine (position on the shot timeline)
     total_shots_fired = 0  # Track total shots for return value
     
     # We need to track actual firing time vs. reload time
     total_reload_time = 0  # Total time spent reloading
-    is_reloading = False   # Track if we're currently reloading
-    
-    # MG parameters
-    wind_up_time = 2.55 if is_mg else 0
-    wind_up_ammo = 47 if is_mg else 0
-    
-    # Start with wind-up period for MG
-    if is_mg and current_ammo > 0:
-        # Calculate how long the wind-up will take based on available ammo
-        wind_up_duration = min(wind_up_time, (current_ammo / wind_up_ammo) * wind_up_time)
-        # Calculate ammo used during wind-up
-        ammo_used_during_windup = min(current_ammo, wind_up_ammo)
-        
-        current_time += wind_up_duration
-        current_ammo -= ammo_used_during_windup
-        total_shots_fired += ammo_used_during_windup
-        shots_fired += ammo_used_during_windup
-        shots_in_mag += ammo_used_during_windup
-        
-        time_points.append(current_time)
-        ammo_points.append(current_ammo)
     
     # Continue simulating until we reach the simulation time
     while current_time < simulation_time:
         # If we're out of ammo, reload
         if current_ammo <= 0:
-            # Start reload process
-            is_reloading = True
-            reload_start_time = current_time
-            
             # Reload and cover time
             reload_duration = effective_reload_time + cover_time
             current_time += reload_duration
@@ -148,47 +271,25 @@ def simulate_ammo_consumption(total_ammo, fire_rate, reload_time, is_mg=False,
             current_ammo = max_ammo
             shots_in_mag = 0  # Reset only shots in current magazine
             
-            # Finished reloading
-            is_reloading = False
-            
             time_points.append(current_time)
             ammo_points.append(current_ammo)
             continue
         
-        # Calculate time to fire one shot
-        if is_mg and current_ammo == max_ammo:
-            # We're starting a fresh magazine for an MG, so we need wind-up again
-            if current_ammo <= wind_up_ammo:
-                time_to_fire = (1 / wind_up_ammo) * wind_up_time
-            else:
-                # Skip to after wind-up
-                time_to_fire = 1 / fire_rate
-                current_time += wind_up_time
-                current_ammo -= wind_up_ammo
-                total_shots_fired += wind_up_ammo
-                shots_fired += wind_up_ammo
-                shots_in_mag += wind_up_ammo
-                
-                # Record the state after wind-up
-                time_points.append(current_time)
-                ammo_points.append(current_ammo)
-                continue
-        else:
-            time_to_fire = 1 / fire_rate
-        
-        # Fire one shot
-        current_time += time_to_fire
+        # Fire one shot; the weapon class decides how long it takes (wind-up, charge, ...)
+        shots_in_mag += 1
+        current_time += kernel.shot_interval(shots_in_mag, fire_rate)
         current_ammo -= 1
         shots_fired += 1
-        shots_in_mag += 1
         total_shots_fired += 1
         
         # Apply Bastion Cube effect - use total shots for 10th shot calculation
         if bastion_cube and shots_fired % 10 == 0:
             current_ammo = min(current_ammo + 4, max_ammo)  # Refund 4 ammo, don't exceed max
         
-        # Record point only when we cross whole number boundaries or at end of ammo
-        if int(time_points[-1]) != int(current_time) or current_ammo <= 0:
+        # Record point only when we cross whole number boundaries, finish a
+        # wind-up or run out of ammo
+        if (int(time_points[-1]) != int(current_time) or current_ammo <= 0
+                or shots_in_mag == kernel.wind_up_shots):
             time_points.append(current_time)
             ammo_points.append(current_ammo)
     
@@ -196,119 +297,221 @@ def simulate_ammo_consumption(total_ammo, fire_rate, reload_time, is_mg=False,
     total_shooting_time = simulation_time - total_reload_time
     return time_points, ammo_points, total_shots_fired, total_shooting_time
 
-# Add custom CSS for light theme
-def add_custom_css():
-    st.markdown("""
-    <style>
-    /* Base app styles */
-    .stApp {
-        background: linear-gradient(to bottom, #f0f2f5, #e8ecf1, #dfe6e9);
-        color: #2d3436 !important;
-    }
-    
-    /* Ensure all text has proper color */
-    .stApp p, .stApp div, .stApp label, .stApp span, 
-    .stApp li, .stMarkdown, .stText, [data-testid="stMarkdownContainer"] {
-        color: #2d3436 !important;
-    }
+def squad_firing_intervals(total_ammo, fire_rate, reload_time, weapon_class,
+                           bastion_cube=False, resilience=0, ammo_bonus=0,
+                           simulation_time=30):
+    """
+    Firing intervals of many units on one shared timeline starting at 0.
     
-    /* Headings styling */
-    h1, h2, h3, h4, h5, h6,
-    .stApp h1, .stApp h2, .stApp h3, .stApp h4, .stApp h5, .stApp h6 {
-        color: #2c3e50 !important;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
+    Arguments are flat arrays with one entry per unit (scalars broadcast).
+    Each unit fires a magazine, reloads and repeats, with magazine timing
+    taken from calculate_uptime_batch. Returns (unit, start, end, shots)
+    arrays with one entry per magazine fired before simulation_time, ends
+    clipped to it; shots counts the rounds fired within each interval.
+    """
+    weapon_class = np.asarray(weapon_class)
+    columns = np.broadcast_arrays(total_ammo, fire_rate, reload_time, bastion_cube,
+                                  resilience, ammo_bonus, weapon_class)
+    total_ammo, fire_rate, reload_time, bastion_cube, resilience, ammo_bonus, weapon_class = columns
+    shooting_time = np.zeros(weapon_class.shape)
+    cycle_time = np.zeros(weapon_class.shape)
+    effective_ammo = np.zeros(weapon_class.shape, dtype=np.int64)
     
-    /* Widget containers */
-    .css-1lcbmhc, .css-1wrcr25, .css-ocqkz7 {
-        background-color: rgba(255, 255, 255, 0.8);
-        border-radius: 10px;
-        padding: 20px;
-        margin-bottom: 20px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-    }
+    # One vectorized uptime call per weapon class
+    for name in np.unique(weapon_class):
+        rows = weapon_class == name
+        results = calculate_uptime_batch(total_ammo[rows], fire_rate[rows], reload_time[rows],
+                                         bastion_cube=bastion_cube[rows],
+                                         resilience=resilience[rows],
+                                         ammo_bonus=ammo_bonus[rows], weapon_class=str(name))
+        shooting_time[rows] = results['shooting_time']
+        cycle_time[rows] = results['total_time']
+        effective_ammo[rows] = results['effective_ammo']
     
-    /* Button styling */
-    .stButton>button {
-        background-color: #3498db;
-        color: white;
-        border: none;
-        padding: 10px 24px;
-        border-radius: 6px;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #2980b9;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }
-    .stop-button > button {
-        background-color: #e74c3c !important;
-    }
-    .stop-button > button:hover {
-        background-color: #c0392b !important;
-    }
+    # Magazines started before the end, laid out as one flat array of events.
+    # Counted like calculate_uptime cycles so both engines agree at the boundary
+    full_cycles = simulation_time // cycle_time
+    magazines = (full_cycles + (simulation_time - full_cycles * cycle_time > 0)).astype(np.int64)
+    unit = np.repeat(np.arange(len(magazines)), magazines)
+    first = np.cumsum(magazines) - magazines
+    index = np.arange(len(unit)) - first[unit]
+    start = index * cycle_time[unit]
+    end = np.minimum(start + shooting_time[unit], simulation_time)
     
-    /* Results container */
-    .results-container {
-        background-color: rgba(255, 255, 255, 0.8);
-        padding: 15px;
-        border-radius: 10px;
-        border-left: 4px solid #3498db;
-        color: #2d3436 !important;
-    }
+    # Full magazines fire every round; a magazine cut off by the end fires
+    # the rounds started before it
+    shots = effective_ammo[unit]
+    for name in np.unique(weapon_class):
+        cut = (weapon_class[unit] == name) & (end < start + shooting_time[unit])
+        started = np.ceil(get_weapon_class(str(name)).shots_fired_batch(end[cut] - start[cut],
+                                                                         fire_rate[unit][cut]))
+        shots[cut] = np.minimum(shots[cut], started.astype(np.int64))
+    return unit, start, end, shots
+
+def simulate_squads(total_ammo, fire_rate, reload_time, weapon_class,
+                    bastion_cube=False, resilience=0, ammo_bonus=0,
+                    simulation_time=30):
+    """
+    Simulates many squads at once over one shared timeline.
     
-    /* Links */
-    a {
-        color: #2980b9;
-    }
+    Arguments are (squads, units) arrays, one entry per unit, and broadcast
+    together; a single squad can be passed as a list of units. Work grows with
+    the number of magazines fired, not with units x shots.
     
-    /* Data tables */
-    .stDataFrame {
-        color: #2d3436 !important;
-    }
+    Returns per-unit 'fire_time', 'uptime' and 'shots' as (squads, units) arrays and
+    per-squad 'total_fire_time', 'mean_uptime', 'coverage' (share of time at
+    least one unit is firing) and 'all_firing' (share of time every unit is).
+    """
+    weapon_class = np.asarray(weapon_class)
+    shape = np.broadcast_shapes(np.shape(total_ammo), np.shape(fire_rate), np.shape(reload_time),
+                                weapon_class.shape, np.shape(bastion_cube), np.shape(resilience),
+                                np.shape(ammo_bonus))
+    if len(shape) == 1:
+        shape = (1,) + shape
+    if len(shape) != 2:
+        raise ValueError(f"Squad arguments must be (squads, units) arrays or a list of units, "
+                         f"got shape {shape}")
+    squads, units = shape
+    flat = [np.broadcast_to(arg, shape).ravel() for arg in
+            (total_ammo, fire_rate, reload_time, weapon_class, bastion_cube, resilience, ammo_bonus)]
+    unit, start, end, shots = squad_firing_intervals(*flat, simulation_time=simulation_time)
     
-    /* Input widgets */
-    .stNumberInput label, .stSlider label, .stRadio label, .stCheckbox label {
-        color: #2d3436 !important;
-    }
+    fire_time = np.bincount(unit, weights=end - start, minlength=squads * units)
     
-    /* Text areas */
-    textarea, .stTextArea label, .stTextArea textarea {
-        color: #2d3436 !important;
-    }
+    # Sweep the start/end events of each squad in time order, counting units firing
+    squad = np.concatenate((unit, unit)) // units
+    times = np.concatenate((start, end))
+    deltas = np.concatenate((np.ones(len(start), dtype=np.int64), -np.ones(len(end), dtype=np.int64)))
+    order = np.lexsort((deltas, times, squad))
+    squad, times, deltas = squad[order], times[order], deltas[order]
+    firing = np.cumsum(deltas)  # Each squad's deltas sum to zero, so counts never leak across squads
+    following = np.append(times[1:], simulation_time)
+    last = np.append(squad[1:] != squad[:-1], True)
+    following[last] = simulation_time
+    durations = following - times
+    coverage = np.bincount(squad, weights=durations * (firing > 0), minlength=squads)
+    all_firing = np.bincount(squad, weights=durations * (firing == units), minlength=squads)
     
-    /* Mobile specific adjustments */
-    @media (max-width: 768px) {
-        .stApp, body, p, div, span, label, li, textarea, .widget-label, .stTextInput>label {
-            color: #2d3436 !important;
-        }
-        
-        [data-testid="stMarkdownContainer"] p, 
-        [data-testid="stMarkdownContainer"] span, 
-        [data-testid="stMarkdownContainer"] div,
-        [data-testid="stMarkdownContainer"] li {
-            color: #2d3436 !important;
-        }
-        
-        /* Force dark text on all elements */
-        * {
-            color: #2d3436 !important;
-        }
-        
-        /* Exception for buttons which should have white text */
-        .stButton>button {
-            color: white !important;
-        }
+    fire_time = fire_time.reshape(shape)
+    uptime = fire_time / simulation_time * 100
+    return {
+        'fire_time': fire_time,
+        'shots': np.bincount(unit, weights=shots, minlength=squads * units).astype(np.int64).reshape(shape),
+        'uptime': uptime,
+        'total_fire_time': fire_time.sum(axis=1),
+        'mean_uptime': uptime.mean(axis=1),
+        'coverage': coverage / simulation_time * 100,
+        'all_firing': all_firing / simulation_time * 100,
     }
-    </style>
-    """, unsafe_allow_html=True)
 
-# Remove GIF-related functions and modify animation to be time-based
-def create_animation(total_ammo, fire_rate, reload_time, is_mg=False, 
-                    bastion_cube=False, resilience=0, ammo_bonus=0,
-                    speed_factor=1.0):
-    
+def sweep_uptime(total_ammo, fire_rate, reload_time, weapon_class=None,
+                 bastion_cube=False, resilience=0, bonus_start=0, bonus_stop=100,
+                 bonus_step=1, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields column batches of uptime results across a range of ammo bonus values.
+    """
+    # Never step past bonus_stop; the epsilon keeps an exact endpoint like 0.1 * 10
+    count = int(math.floor((bonus_stop - bonus_start) / bonus_step + 1e-9)) + 1
+    for batch_start in range(0, max(count, 0), batch_size):
+        ammo_bonus = bonus_start + np.arange(batch_start, min(batch_start + batch_size, count)) * bonus_step
+        results = calculate_uptime_batch(total_ammo, fire_rate, reload_time,
+                                         bastion_cube=bastion_cube, resilience=resilience,
+                                         ammo_bonus=ammo_bonus, weapon_class=weapon_class)
+        columns = {'ammo_bonus': ammo_bonus}
+        for name in ('effective_ammo', 'shooting_time', 'reload_time', 'total_time', 'uptime'):
+            columns[name] = np.broadcast_to(results[name], ammo_bonus.shape)
+        yield columns
+
+def parse_roster(text):
+    """
+    Parses a roster from CSV lines of
+    name, base ammo, fire rate, reload time, weapon class, equipment, ammo bonus.
+    The weapon class may also be given as yes/no for Machine Gun or not.
+    """
+    roster = []
+    for row in csv.reader(io.StringIO(text)):
+        row = [field.strip() for field in row]
+        if not row or not row[0] or row[0].startswith('#'):
+            continue
+        if len(row) != 7:
+            raise ValueError(f"Expected 7 fields for '{row[0]}', got {len(row)}")
+        name, total_ammo, fire_rate, reload_time, weapon_class, equipment, ammo_bonus = row
+        if weapon_class.lower() in ("yes", "y", "true", "1", "mg"):
+            weapon_class = "Machine Gun"
+        elif weapon_class.lower() in ("no", "n", "false", "0", ""):
+            weapon_class = "Assault Rifle"
+        elif weapon_class not in WEAPON_CLASSES:
+            raise ValueError(f"Unknown weapon class for '{name}': {weapon_class}")
+        if equipment not in ("None", "Bastion Cube", "Resilience"):
+            raise ValueError(f"Unknown equipment for '{name}': {equipment}")
+        roster.append({
+            'name': name,
+            'base_ammo': int(total_ammo),
+            'fire_rate': float(fire_rate),
+            'reload_time': float(reload_time),
+            'weapon_class': weapon_class,
+            'equipment': equipment,
+            'ammo_bonus': float(ammo_bonus),
+        })
+    return roster
+
+def evaluate_roster(roster, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields column batches of uptime results for each unit in a parsed roster.
+    """
+    for batch_start in range(0, len(roster), batch_size):
+        units = roster[batch_start:batch_start + batch_size]
+        # Roster inputs as given (base reload time), then the calculated results
+        columns = {name: [unit[name] for unit in units] for name in units[0]}
+        equipment = np.array(columns['equipment'])
+        weapon_classes = np.array(columns['weapon_class'])
+        results = {name: np.zeros(len(units)) for name in ('shooting_time', 'total_time', 'uptime')}
+        results['effective_ammo'] = np.zeros(len(units), dtype=np.int64)
+        
+        # Each weapon class is evaluated as one vectorized batch
+        for weapon_class in np.unique(weapon_classes):
+            rows = weapon_classes == weapon_class
+            class_results = calculate_uptime_batch(
+                np.array(columns['base_ammo'])[rows], np.array(columns['fire_rate'])[rows],
+                np.array(columns['reload_time'])[rows],
+                bastion_cube=equipment[rows] == "Bastion Cube",
+                resilience=np.where(equipment[rows] == "Resilience", 29.69, 0),
+                ammo_bonus=np.array(columns['ammo_bonus'])[rows],
+                weapon_class=str(weapon_class)
+            )
+            for name in results:
+                results[name][rows] = class_results[name]
+        columns.update(results)
+        yield columns
+
+def simulate_trajectories(total_ammo, fire_rate, reload_time, weapon_class=None, ammo_bonus=0,
+                          simulation_time=30, equipment=("None", "Bastion Cube", "Resilience")):
+    """
+    Yields one column batch of simulated ammo over time per equipment option.
+    """
+    for option in equipment:
+        times, ammo, _, _ = simulate_ammo_consumption(
+            total_ammo, fire_rate, reload_time,
+            bastion_cube=option == "Bastion Cube",
+            resilience=29.69 if option == "Resilience" else 0,
+            ammo_bonus=ammo_bonus, simulation_time=simulation_time,
+            weapon_class=weapon_class
+        )
+        yield {'equipment': [option] * len(times), 'time': times, 'ammo': ammo}
+
+# Add custom CSS for light theme
+def add_custom_css():
+    # The stylesheet lives in static/ and is served by Streamlit's static file
+    # server, so the browser fetches it once per session and reruns only resend
+    # this short link tag instead of the whole <style> block.
+    st.markdown('<link rel="stylesheet" href="app/static/style.css">',
+                unsafe_allow_html=True)
+
+def animation_setup(total_ammo, reload_time, resilience=0, ammo_bonus=0):
+    """
+    Max ammo and reload time (including cover) used by the animation.
+    Unlike calculate_uptime, resilience applies even with a Bastion Cube.
+    """
     # Apply ammo bonus
     if ammo_bonus > 0:
         max_ammo = int(total_ammo * (1 + ammo_bonus / 100))
@@ -323,6 +526,104 @@ def create_animation(total_ammo, fire_rate, reload_time, is_mg=False,
     
     # Add cover time to reload
     effective_reload_time += 0.23333  # Cover time
+    return max_ammo, effective_reload_time
+
+def start_animation_state(max_ammo, kernel):
+    """
+    Initial state for advance_animation: a full magazine at time 0.
+    """
+    return {
+        'simulation_time': 0,
+        'current_ammo': max_ammo,
+        'is_reloading': False,
+        'is_winding_up': kernel.wind_up_time > 0,
+        'reload_start_time': 0,
+        'total_shots': 0,
+        'shots_in_mag': 0,  # Position on the weapon class's shot timeline
+        'mag_firing_time': 0,  # Time spent firing the current magazine
+    }
+
+def advance_animation(state, sim_time_increment, kernel, fire_rate, max_ammo,
+                      effective_reload_time, bastion_cube=False):
+    """
+    Advances the animation's frame-based firing rules by one frame, updating
+    state in place. effective_reload_time includes cover time.
+    
+    Returns (phase, progress) for the status display, where phase is one of
+    'reloading', 'reload_done', 'start_reload', 'winding_up' or 'firing'.
+    """
+    # Update simulation time
+    state['simulation_time'] += sim_time_increment
+    
+    # Handle reloading
+    if state['is_reloading']:
+        elapsed_reload_time = state['simulation_time'] - state['reload_start_time']
+        reload_progress = elapsed_reload_time / effective_reload_time
+        
+        if reload_progress < 1.0:
+            # Still reloading
+            return 'reloading', min(1.0, reload_progress)
+        
+        # Finished reloading
+        state['current_ammo'] = max_ammo
+        state['is_reloading'] = False
+        state['is_winding_up'] = kernel.wind_up_time > 0
+        state['shots_in_mag'] = 0
+        state['mag_firing_time'] = 0
+        return 'reload_done', 1.0
+    
+    # Start reload if ammo is empty
+    if state['current_ammo'] <= 0:
+        state['is_reloading'] = True
+        state['reload_start_time'] = state['simulation_time']
+        return 'start_reload', 0.0
+    
+    # Handle firing (only when not reloading)
+    state['mag_firing_time'] += sim_time_increment
+    
+    # Track wind-up progress for weapon classes that have one
+    if state['is_winding_up']:
+        phase = 'winding_up'
+        progress = min(1.0, state['mag_firing_time'] / kernel.wind_up_time)
+        if state['mag_firing_time'] >= kernel.wind_up_time:
+            state['is_winding_up'] = False
+    else:
+        phase, progress = 'firing', 1.0
+    
+    # Shots due by now according to the weapon class's shot timeline
+    whole_shots = int(kernel.shots_fired(state['mag_firing_time'], fire_rate)) - state['shots_in_mag']
+    
+    # Update ammo and total shots
+    if whole_shots > 0:
+        # Limit shots to available ammo
+        actual_shots = min(whole_shots, state['current_ammo'])
+        state['current_ammo'] = max(0, state['current_ammo'] - actual_shots)
+        state['total_shots'] += actual_shots
+        state['shots_in_mag'] += actual_shots
+        
+        # Apply Bastion Cube effect
+        if bastion_cube and actual_shots > 0:
+            # Check each shot that was fired for 10th shot
+            bastion_refunds = 0
+            for i in range(actual_shots):
+                shot_number = state['total_shots'] - actual_shots + i + 1
+                if shot_number % 10 == 0:
+                    bastion_refunds += 4
+            
+            if bastion_refunds > 0:
+                state['current_ammo'] = min(state['current_ammo'] + bastion_refunds, max_ammo)
+    
+    return phase, progress
+
+# Remove GIF-related functions and modify animation to be time-based
+def create_animation(total_ammo, fire_rate, reload_time, is_mg=False, 
+                    bastion_cube=False, resilience=0, ammo_bonus=0,
+                    speed_factor=1.0, weapon_class=None):
+    kernel = get_weapon_class(weapon_class, is_mg)
+    max_ammo, effective_reload_time = animation_setup(total_ammo, reload_time, resilience, ammo_bonus)
+    
+    # Deferred so the Calculator tab never pays for loading matplotlib
+    import matplotlib.pyplot as plt
     
     # Setup placeholders for the UI elements
     chart_placeholder = st.empty()
@@ -332,20 +633,11 @@ def create_animation(total_ammo, fire_rate, reload_time, is_mg=False,
     debug_placeholder = st.empty()  # For debugging info if needed
     
     # Initialize variables
-    current_ammo = max_ammo
-    is_reloading = False
-    is_winding_up = is_mg
-    reload_start_time = 0
+    state = start_animation_state(max_ammo, kernel)
     simulation_time = 0
+    current_ammo = max_ammo
     time_points = [0]
     ammo_points = [max_ammo]
-    total_shots = 0
-    fractional_shots = 0  # Track partial shots
-    
-    # Machine gun parameters
-    wind_up_time = 2.55 if is_mg else 0
-    wind_up_ammo = 47 if is_mg else 0
-    windup_progress_shots = 0
     
     # Setup real-time tracking
     start_time = time.time()
@@ -368,111 +660,28 @@ def create_animation(total_ammo, fire_rate, reload_time, is_mg=False,
             # Scale elapsed time by speed factor to get simulation time increment
             sim_time_increment = elapsed_since_last * speed_factor
             
-            # Update simulation time
-            simulation_time += sim_time_increment
-            
-            # Handle reloading
-            if is_reloading:
-                elapsed_reload_time = simulation_time - reload_start_time
-                reload_progress = elapsed_reload_time / effective_reload_time
-                
-                if reload_progress < 1.0:
-                    # Still reloading
-                    status_placeholder.markdown(f"### 🔄 RELOADING...")
-                    progress_placeholder.progress(min(1.0, reload_progress))
-                else:
-                    # Finished reloading
-                    current_ammo = max_ammo
-                    is_reloading = False
-                    is_winding_up = is_mg
-                    windup_progress_shots = 0
-                    progress_placeholder.empty()
+            phase, progress = advance_animation(state, sim_time_increment, kernel, fire_rate,
+                                                max_ammo, effective_reload_time, bastion_cube)
+            simulation_time = state['simulation_time']
+            current_ammo = state['current_ammo']
+            total_shots = state['total_shots']
             
-            # Start reload if ammo is empty
-            elif current_ammo <= 0:
-                is_reloading = True
-                reload_start_time = simulation_time
+            if phase == 'reloading':
+                status_placeholder.markdown(f"### 🔄 RELOADING...")
+                progress_placeholder.progress(progress)
+            elif phase == 'reload_done':
+                progress_placeholder.empty()
+            elif phase == 'start_reload':
                 status_placeholder.markdown(f"### 🔄 STARTING RELOAD...")
                 progress_placeholder.progress(0.0)
-            
-            # Handle firing (only when not reloading)
-            elif not is_reloading:
-                # Handle MG wind-up
-                if is_winding_up:
-                    status_placeholder.markdown(f"### 🔄 WINDING UP...")
-                    
-                    # Calculate ammo used during wind-up based on real time
-                    windup_rate = wind_up_ammo / wind_up_time  # ammo per second during windup
-                    ammo_used_this_frame = windup_rate * sim_time_increment
-                    
-                    # Update windup progress shots
-                    windup_progress_shots += ammo_used_this_frame
-                    
-                    # Show windup progress
-                    progress_percentage = min(1.0, windup_progress_shots / wind_up_ammo)
-                    progress_placeholder.progress(progress_percentage)
-                    
-                    # Reduce ammo
-                    whole_shots = int(ammo_used_this_frame)
-                    fractional_shots += ammo_used_this_frame - whole_shots
-                    
-                    # Handle accumulated fractional shots
-                    if fractional_shots >= 1:
-                        extra_shots = int(fractional_shots)
-                        whole_shots += extra_shots
-                        fractional_shots -= extra_shots
-                    
-                    if whole_shots > 0:
-                        # Limit shots to available ammo
-                        actual_shots = min(whole_shots, current_ammo)
-                        # Update ammo and shots
-                        current_ammo = max(0, current_ammo - actual_shots)
-                        total_shots += actual_shots
-                        
-                        # Adjust fractional shots if we couldn't fire all shots
-                        if actual_shots < whole_shots:
-                            # We hit empty - don't carry over fractional shots
-                            fractional_shots = 0
-                    
-                    # Check if wind-up complete
-                    if windup_progress_shots >= wind_up_ammo:
-                        is_winding_up = False
-                        progress_placeholder.empty()
-                
-                # Normal firing (or MG after wind-up)
+            elif phase == 'winding_up':
+                status_placeholder.markdown(f"### 🔄 WINDING UP...")
+                if progress < 1.0:
+                    progress_placeholder.progress(progress)
                 else:
-                    status_placeholder.markdown(f"### 🔥 FIRING...")
-                    
-                    # Calculate shots fired in this time increment
-                    shots_this_frame = fire_rate * sim_time_increment
-                    
-                    # Add to fractional tracking and calculate whole shots
-                    fractional_shots += shots_this_frame
-                    whole_shots = int(fractional_shots)
-                    fractional_shots -= whole_shots
-                    
-                    # Update ammo and total shots
-                    if whole_shots > 0:
-                        # Limit shots to available ammo
-                        actual_shots = min(whole_shots, current_ammo)
-                        current_ammo = max(0, current_ammo - actual_shots)
-                        total_shots += actual_shots
-                        
-                        # Reset fractional shots if we're out of ammo
-                        if actual_shots < whole_shots:
-                            fractional_shots = 0
-                        
-                        # Apply Bastion Cube effect
-                        if bastion_cube and actual_shots > 0:
-                            # Check each shot that was fired for 10th shot
-                            bastion_refunds = 0
-                            for i in range(actual_shots):
-                                shot_number = total_shots - actual_shots + i + 1
-                                if shot_number % 10 == 0:
-                                    bastion_refunds += 4
-                            
-                            if bastion_refunds > 0:
-                                current_ammo = min(current_ammo + bastion_refunds, max_ammo)
+                    progress_placeholder.empty()
+            else:
+                status_placeholder.markdown(f"### 🔥 FIRING...")
             
             # Update time and ammo points for the chart (manage length for performance)
             time_points.append(simulation_time)
@@ -526,7 +735,8 @@ def main():
     st.markdown("### Calculate and visualize weapon performance")
     
     # Create tabs
-    tab1, tab2, tab3 = st.tabs(["💼 Calculator", "📊 Ammo Consumption", "🎬 Animated Simulation"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["💼 Calculator", "📊 Ammo Consumption", "🎬 Animated Simulation",
+                                                  "📁 Export", "📈 Breakpoints", "👥 Squad"])
     
     with tab1:
         st.header("Weapon Uptime Calculator")
@@ -537,8 +747,7 @@ def main():
             total_ammo = st.number_input("Base Ammo", min_value=1, value=300, step=1)
             fire_rate = st.number_input("Fire Rate (shots/sec)", min_value=0.1, value=60.0, step=0.1)
             reload_time = st.number_input("Reload Time (sec)", min_value=0.1, value=2.3, step=0.1)
-            st.markdown("###### Weapon Type")
-            is_mg = st.checkbox("Machine Gun (MG)")
+            weapon_class = st.selectbox("Weapon Class", list(WEAPON_CLASSES))
             
         with col2:
             equipment = st.radio(
@@ -553,8 +762,9 @@ def main():
         
         if st.button("Calculate Uptime", key="calc_button"):
             # Calculate uptime
-            results = calculate_uptime(total_ammo, fire_rate, reload_time, is_mg, 
-                                     bastion_cube, resilience, ammo_bonus)
+            results = calculate_uptime(total_ammo, fire_rate, reload_time, 
+                                     bastion_cube=bastion_cube, resilience=resilience,
+                                     ammo_bonus=ammo_bonus, weapon_class=weapon_class)
             
             # Display results
             st.markdown("### Results")
@@ -589,16 +799,7 @@ def main():
             else:
                 breakdown += f"- Reload time: {reload_time}s\n"
                 
-            if is_mg:
-                breakdown += f"- Machine Gun with wind-up time: 2.55s for first 47 ammo\n"
-                if results['effective_ammo'] <= 47:
-                    breakdown += f"- Shooting time: ({results['effective_ammo']}/47) * 2.55 = {results['shooting_time']:.2f}s\n"
-                else:
-                    remaining_ammo = results['effective_ammo'] - 47
-                    remaining_time = remaining_ammo / fire_rate
-                    breakdown += f"- Shooting time: 2.55s + ({remaining_ammo}/{fire_rate}) = {results['shooting_time']:.2f}s\n"
-            else:
-                breakdown += f"- Shooting time: {results['effective_ammo']}/{fire_rate} = {results['shooting_time']:.2f}s\n"
+            breakdown += get_weapon_class(weapon_class).breakdown(results['effective_ammo'], fire_rate)
                 
             breakdown += f"- Magazine cycle: {results['shooting_time']:.2f}s + {results['reload_time']:.2f}s (reload) + {results['cover_time']:.2f}s (cover) = {results['total_time']:.2f}s\n"
             breakdown += f"- Uptime: {results['shooting_time']:.2f}s / {results['total_time']:.2f}s = {results['uptime']:.2f}%"
@@ -614,8 +815,7 @@ def main():
             ammo_cons_total_ammo = st.number_input("Base Ammo", min_value=1, value=300, step=1, key="vis_ammo")
             ammo_cons_fire_rate = st.number_input("Fire Rate (shots/sec)", min_value=0.1, value=60.0, step=0.1, key="vis_fire")
             ammo_cons_reload_time = st.number_input("Reload Time (sec)", min_value=0.1, value=2.3, step=0.1, key="vis_reload")
-            st.markdown("###### Weapon Type")
-            ammo_cons_is_mg = st.checkbox("Machine Gun (MG)", key="vis_mg")
+            ammo_cons_weapon_class = st.selectbox("Weapon Class", list(WEAPON_CLASSES), key="vis_weapon")
         
         with col2:
             ammo_cons_sim_time = st.number_input("Simulation Time (sec)", min_value=1, value=30, step=1)
@@ -628,6 +828,9 @@ def main():
         )
         
         if st.button("Generate Ammo Consumption Graph", key="gen_button"):
+            # Deferred so the Calculator tab never pays for loading matplotlib
+            import matplotlib.pyplot as plt
+            
             # Create figure
             fig, ax = plt.subplots(figsize=(10, 6))
             fig.tight_layout(pad=5)
@@ -637,27 +840,27 @@ def main():
             
             # Always show baseline
             baseline_times, baseline_ammo, baseline_shots, baseline_shoot_time = simulate_ammo_consumption(
-                ammo_cons_total_ammo, ammo_cons_fire_rate, ammo_cons_reload_time, ammo_cons_is_mg, 
+                ammo_cons_total_ammo, ammo_cons_fire_rate, ammo_cons_reload_time, 
                 bastion_cube=False, resilience=0, ammo_bonus=ammo_cons_ammo_bonus,
-                simulation_time=ammo_cons_sim_time
+                simulation_time=ammo_cons_sim_time, weapon_class=ammo_cons_weapon_class
             )
             ax.plot(baseline_times, baseline_ammo, '-', color='gray', alpha=0.7, label='No Equipment')
             
             # Add Bastion Cube line if requested
             if ammo_cons_equipment in ["Compare Both", "Bastion Cube Only"]:
                 bastion_times, bastion_ammo, bastion_shots, bastion_shoot_time = simulate_ammo_consumption(
-                    ammo_cons_total_ammo, ammo_cons_fire_rate, ammo_cons_reload_time, ammo_cons_is_mg, 
+                    ammo_cons_total_ammo, ammo_cons_fire_rate, ammo_cons_reload_time, 
                     bastion_cube=True, resilience=0, ammo_bonus=ammo_cons_ammo_bonus,
-                    simulation_time=ammo_cons_sim_time
+                    simulation_time=ammo_cons_sim_time, weapon_class=ammo_cons_weapon_class
                 )
                 ax.plot(bastion_times, bastion_ammo, '-', color='green', label='Bastion Cube')
             
             # Add Resilience line if requested
             if ammo_cons_equipment in ["Compare Both", "Resilience Only"]:
                 resilience_times, resilience_ammo, resilience_shots, resilience_shoot_time = simulate_ammo_consumption(
-                    ammo_cons_total_ammo, ammo_cons_fire_rate, ammo_cons_reload_time, ammo_cons_is_mg, 
+                    ammo_cons_total_ammo, ammo_cons_fire_rate, ammo_cons_reload_time, 
                     bastion_cube=False, resilience=resilience_value, ammo_bonus=ammo_cons_ammo_bonus,
-                    simulation_time=ammo_cons_sim_time
+                    simulation_time=ammo_cons_sim_time, weapon_class=ammo_cons_weapon_class
                 )
                 ax.plot(resilience_times, resilience_ammo, '-', color='blue', label='Resilience')
             
@@ -675,8 +878,8 @@ def main():
             title = f'Ammo Consumption Over Time ({ammo_cons_sim_time}s)'
             subtitle = f'Base Ammo: {ammo_cons_total_ammo}, Fire Rate: {ammo_cons_fire_rate}/s, Reload: {ammo_cons_reload_time}s'
             
-            if ammo_cons_is_mg:
-                subtitle += ", Machine Gun"
+            if ammo_cons_weapon_class != "Assault Rifle":
+                subtitle += f", {ammo_cons_weapon_class}"
             if ammo_cons_ammo_bonus > 0:
                 subtitle += f", +{ammo_cons_ammo_bonus}% Ammo"
             
@@ -725,13 +928,13 @@ def main():
             anim_ammo_bonus = st.number_input("Max Ammo Bonus (%)", min_value=0, value=0, step=1, key="anim_bonus")
         
         with col2:
-            st.markdown("###### Weapon Type")
-            anim_is_mg = st.checkbox("Machine Gun (MG)", key="anim_mg")
+            anim_weapon_class = st.selectbox("Weapon Class", list(WEAPON_CLASSES), key="anim_weapon")
             st.markdown("##### Equipment")
             anim_equipment = st.radio(
-                "",
+                "Equipment",
                 ["None", "Bastion Cube", "Resilience"],
-                key="anim_equip"
+                key="anim_equip",
+                label_visibility="collapsed"
             )
             anim_speed = st.slider("Animation Speed", min_value=0.5, max_value=5.0, value=1.0, step=0.5,
                                  help="Higher values make the simulation run faster")
@@ -754,20 +957,6 @@ def main():
                 stop_button = st.button("⏹️ Stop", key="stop_anim_button", 
                                    on_click=lambda: setattr(st.session_state, 'stop_animation', True))
                 
-        # Add CSS targeting specifically the stop button
-        st.markdown("""
-            <style>
-            /* Target the stop button specifically */
-            [data-testid="stButton"] button:contains("⏹️ Stop") {
-                background-color: #e74c3c;
-                color: white;
-            }
-            [data-testid="stButton"] button:contains("⏹️ Stop"):hover {
-                background-color: #c0392b;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-        
         # Set values based on equipment selection 
         anim_bastion_cube = anim_equipment == "Bastion Cube"
         anim_resilience = 29.69 if anim_equipment == "Resilience" else 0
@@ -779,12 +968,223 @@ def main():
                 anim_total_ammo, 
                 anim_fire_rate, 
                 anim_reload_time, 
-                anim_is_mg, 
-                anim_bastion_cube, 
-                anim_resilience, 
-                anim_ammo_bonus,
-                anim_speed
+                bastion_cube=anim_bastion_cube, 
+                resilience=anim_resilience, 
+                ammo_bonus=anim_ammo_bonus,
+                speed_factor=anim_speed,
+                weapon_class=anim_weapon_class
+            )
+    
+    with tab4:
+        st.header("Export Results")
+        st.markdown("Download results as columnar files for analysis in notebooks.")
+        
+        export_dataset = st.radio(
+            "Dataset",
+            ["Uptime Sweep", "Roster Evaluation", "Simulation Trajectories"],
+            key="export_dataset"
+        )
+        export_format = st.radio("Format", ["Parquet", "Arrow IPC"], key="export_format",
+                                 horizontal=True)
+        
+        if export_dataset == "Uptime Sweep":
+            st.caption("Sweeps Max Ammo Bonus for the weapon and equipment set on the Calculator tab.")
+            col1, col2, col3 = st.columns(3)
+            sweep_start = col1.number_input("Bonus From (%)", min_value=0.0, value=0.0, step=1.0, key="sweep_start")
+            sweep_stop = col2.number_input("Bonus To (%)", min_value=0.0, value=500.0, step=1.0, key="sweep_stop")
+            sweep_step = col3.number_input("Step (%)", min_value=0.01, value=1.0, step=1.0, key="sweep_step")
+            export_params = {
+                'total_ammo': total_ammo, 'fire_rate': fire_rate, 'reload_time': reload_time,
+                'weapon_class': weapon_class, 'equipment': equipment, 'resilience': resilience,
+                'bonus_start': sweep_start, 'bonus_stop': sweep_stop, 'bonus_step': sweep_step,
+            }
+        elif export_dataset == "Roster Evaluation":
+            st.caption("One unit per line: name, base ammo, fire rate, reload time, weapon class, "
+                       "equipment (None, Bastion Cube or Resilience), ammo bonus %.")
+            roster_text = st.text_area(
+                "Roster",
+                "Unit A, 300, 60, 2.3, Machine Gun, Bastion Cube, 0\n"
+                "Unit B, 60, 12, 1.5, Assault Rifle, Resilience, 50\n",
+                height=200, key="export_roster"
             )
+            export_params = {'roster': roster_text}
+        else:
+            st.caption("Simulates every equipment option for the weapon set on the Ammo Consumption tab.")
+            export_params = {
+                'total_ammo': ammo_cons_total_ammo, 'fire_rate': ammo_cons_fire_rate,
+                'reload_time': ammo_cons_reload_time, 'weapon_class': ammo_cons_weapon_class,
+                'ammo_bonus': ammo_cons_ammo_bonus, 'simulation_time': ammo_cons_sim_time,
+            }
+        
+        if st.button("Prepare Export", key="export_button"):
+            # Deferred so only users who export pay for loading pyarrow
+            import export
+            
+            try:
+                if export_dataset == "Uptime Sweep":
+                    schema = export.SWEEP_SCHEMA
+                    batches = sweep_uptime(total_ammo, fire_rate, reload_time, weapon_class,
+                                           bastion_cube, resilience,
+                                           sweep_start, sweep_stop, sweep_step)
+                elif export_dataset == "Roster Evaluation":
+                    schema = export.ROSTER_SCHEMA
+                    batches = evaluate_roster(parse_roster(roster_text))
+                else:
+                    schema = export.TRAJECTORY_SCHEMA
+                    batches = simulate_trajectories(**export_params)
+                
+                buffer = io.BytesIO()
+                rows = export.write_batches(buffer, schema, batches, export_params,
+                                            ENGINE_VERSION, export_format)
+            except ValueError as e:
+                st.error(f"Could not export: {e}")
+            else:
+                file_name = export_dataset.lower().replace(" ", "_") + export.FORMATS[export_format]
+                st.success(f"{rows} rows ready")
+                st.download_button("Download " + file_name, buffer.getvalue(), file_name=file_name,
+                                   mime="application/octet-stream", key="export_download",
+                                   on_click="ignore")
+    
+    with tab5:
+        st.header("Ammo Bonus Breakpoints")
+        st.markdown("Max ammo is rounded down, so uptime only changes at certain Max Ammo Bonus values. "
+                    "Bonus between two breakpoints is wasted.")
+        st.caption("Uses the weapon and equipment set on the Calculator tab.")
+        
+        col1, col2, col3 = st.columns(3)
+        bp_start = col1.number_input("Bonus From (%)", min_value=0.0, value=0.0, step=1.0, key="bp_start")
+        bp_stop = col2.number_input("Bonus To (%)", min_value=0.0, value=100.0, step=10.0, key="bp_stop")
+        bp_min_gain = col3.number_input("Min Uptime Gain (pp)", min_value=0.0, value=0.0, step=0.1,
+                                        key="bp_min_gain",
+                                        help="Hide breakpoints that raise uptime by less than this")
+        
+        # Off by default so a first page load doesn't pull in matplotlib and pandas
+        if st.toggle("Show breakpoints", key="bp_show"):
+            import matplotlib.pyplot as plt
+            
+            breakpoints = find_bonus_breakpoints(total_ammo, fire_rate, reload_time, weapon_class,
+                                                 bastion_cube, resilience, bp_start, bp_stop)
+            start = calculate_uptime(total_ammo, fire_rate, reload_time, bastion_cube=bastion_cube,
+                                     resilience=resilience, ammo_bonus=bp_start,
+                                     weapon_class=weapon_class)
+            shown = breakpoints['uptime_gain'] >= bp_min_gain
+            
+            st.markdown(f"**{len(breakpoints['ammo_bonus'])}** breakpoints between {bp_start:g}% and "
+                        f"{bp_stop:g}%, {int(shown.sum())} shown. "
+                        f"Uptime at {bp_start:g}%: {start['uptime']:.2f}%")
+            
+            # The uptime curve is exactly a step function through the breakpoints
+            fig, ax = plt.subplots(figsize=(10, 5))
+            ax.step(np.concatenate(([bp_start], breakpoints['ammo_bonus'], [bp_stop])),
+                    np.concatenate(([start['uptime']], breakpoints['uptime'],
+                                    breakpoints['uptime'][-1:] if len(breakpoints['uptime']) else [start['uptime']])),
+                    where='post', color='#3498db', label='Uptime')
+            # Past a few hundred markers the dots only hide the curve and slow every rerun
+            if shown.sum() <= 500:
+                ax.scatter(breakpoints['ammo_bonus'][shown], breakpoints['uptime'][shown],
+                           s=12, color='#2c3e50', zorder=3, label='Breakpoint')
+                # Bastion Cube gains a whole refund cycle at some breakpoints
+                refund = shown & (breakpoints['shots_gained'] > 1)
+                if refund.any():
+                    ax.scatter(breakpoints['ammo_bonus'][refund], breakpoints['uptime'][refund],
+                               s=30, color='#e74c3c', zorder=4, label='Extra Bastion refund')
+            ax.set_title(f'Uptime vs Max Ammo Bonus (Base Ammo: {total_ammo}, {weapon_class}, {equipment})',
+                         fontsize=12)
+            ax.set_xlabel('Max Ammo Bonus (%)')
+            ax.set_ylabel('Uptime (%)')
+            ax.grid(True, linestyle='--', alpha=0.6)
+            ax.legend(loc='lower right', framealpha=0.9)
+            # Rendered on every rerun, so use a lower dpi than st.pyplot's 200
+            chart = io.BytesIO()
+            fig.savefig(chart, format="png", dpi=120, bbox_inches="tight")
+            plt.close(fig)
+            st.image(chart)
+            
+            st.dataframe({
+                "Ammo Bonus (%)": breakpoints['ammo_bonus'][shown],
+                "Min Whole %": breakpoints['whole_bonus'][shown],
+                "Max Ammo": breakpoints['max_ammo'][shown],
+                "Effective Shots": breakpoints['effective_ammo'][shown],
+                "Shots Gained": breakpoints['shots_gained'][shown],
+                "Uptime (%)": breakpoints['uptime'][shown],
+                "Uptime Gain (pp)": breakpoints['uptime_gain'][shown],
+            }, hide_index=True, width="stretch")
+    
+    with tab6:
+        st.header("Squad Simulation")
+        st.markdown("Five units firing on one shared timeline. Each unit fires its magazine, "
+                    "then reloads in cover.")
+        
+        squad_time = st.number_input("Simulation Time (sec)", min_value=1, value=180, step=10,
+                                     key="squad_time")
+        squad_defaults = [
+            ("Assault Rifle", 60, 12.0, 1.5),
+            ("Assault Rifle", 120, 20.0, 1.2),
+            ("Machine Gun", 300, 60.0, 2.3),
+            ("Machine Gun", 47, 30.0, 1.5),
+            ("Assault Rifle", 40, 8.0, 2.0),
+        ]
+        units = []
+        for i, (column, (default_class, default_ammo, default_fire, default_reload)) in enumerate(
+                zip(st.columns(len(squad_defaults)), squad_defaults)):
+            with column:
+                st.markdown(f"##### Unit {i + 1}")
+                unit_class = st.selectbox("Weapon Class", list(WEAPON_CLASSES),
+                                          index=list(WEAPON_CLASSES).index(default_class),
+                                          key=f"squad_weapon_{i}")
+                unit_ammo = st.number_input("Base Ammo", min_value=1, value=default_ammo, step=1,
+                                            key=f"squad_ammo_{i}")
+                unit_fire = st.number_input("Fire Rate", min_value=0.1, value=default_fire, step=0.1,
+                                            key=f"squad_fire_{i}")
+                unit_reload = st.number_input("Reload Time", min_value=0.1, value=default_reload, step=0.1,
+                                              key=f"squad_reload_{i}")
+                unit_equipment = st.selectbox("Equipment", ["None", "Bastion Cube", "Resilience"],
+                                              key=f"squad_equip_{i}")
+                unit_bonus = st.number_input("Ammo Bonus (%)", min_value=0.0, value=0.0, step=1.0,
+                                             key=f"squad_bonus_{i}")
+                units.append((unit_ammo, unit_fire, unit_reload, unit_class,
+                              unit_equipment == "Bastion Cube",
+                              29.69 if unit_equipment == "Resilience" else 0, unit_bonus))
+        
+        # Off by default so a first page load doesn't pull in matplotlib
+        if st.toggle("Simulate squad", key="squad_show"):
+            import matplotlib.pyplot as plt
+            
+            columns = [list(column) for column in zip(*units)]
+            results = simulate_squads(*columns, simulation_time=squad_time)
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Average Uptime", f"{results['mean_uptime'][0]:.2f}%")
+            col2.metric("Someone Firing", f"{results['coverage'][0]:.2f}%",
+                        help="Share of the time at least one unit is firing")
+            col3.metric("Everyone Firing", f"{results['all_firing'][0]:.2f}%",
+                        help="Share of the time all units are firing together")
+            
+            unit, start, end, _ = squad_firing_intervals(*[np.asarray(column) for column in columns],
+                                                      simulation_time=squad_time)
+            fig, ax = plt.subplots(figsize=(10, 4))
+            for i in range(len(units)):
+                rows = unit == i
+                ax.broken_barh(list(zip(start[rows], end[rows] - start[rows])), (i - 0.4, 0.8),
+                               color='#3498db')
+            ax.set_yticks(range(len(units)))
+            ax.set_yticklabels([f"Unit {i + 1} ({units[i][3]})" for i in range(len(units))])
+            ax.invert_yaxis()
+            ax.set_xlim(0, squad_time)
+            ax.set_xlabel('Time (seconds)')
+            ax.set_title('Firing Timeline', fontsize=12)
+            ax.grid(True, axis='x', linestyle='--', alpha=0.6)
+            chart = io.BytesIO()
+            fig.savefig(chart, format="png", dpi=120, bbox_inches="tight")
+            plt.close(fig)
+            st.image(chart)
+            
+            st.dataframe({
+                "Unit": [f"Unit {i + 1}" for i in range(len(units))],
+                "Weapon Class": columns[3],
+                "Fire Time (s)": results['fire_time'][0],
+                "Uptime (%)": results['uptime'][0],
+            }, hide_index=True, width="stretch")
     
     # Add footer
     st.markdown("---")
@@ -794,7 +1194,7 @@ def main():
     The calculator takes into account:
     - Base weapon stats (ammo, fire rate, reload time)
     - Cubes (Bastion Cube or Resilience)
-    - Machine Gun wind-up mechanics
+    - Weapon class timing (Machine Gun wind-up)
     - Cover downtime during reloads
     - Ammo bonuses from skills
                 
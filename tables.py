@@ -0,0 +1,202 @@
+"""
+Precomputed tables shared read-only between server worker processes.
+
+Large lookup tables are built once and published as plain .npy column files.
+Every worker memory-maps them read-only, so all processes on a host share one
+copy through the page cache instead of each holding its own. Point TABLE_DIR
+(or the NIKKE_TABLE_DIR environment variable) at /dev/shm to keep the tables
+in shared memory rather than on disk.
+
+Each publish writes a new numbered generation next to the old one and then
+swaps the table's CURRENT pointer, so a rebuilt table reaches running workers
+on their next lookup without a restart:
+
+    python tables.py build breakpoints
+    python tables.py list
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishes aren't serialized, see publish_table
+    fcntl = None
+
+TABLE_DIR = os.environ.get("NIKKE_TABLE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables"))
+KEEP_GENERATIONS = 2  # Older generations are removed once a newer one is published
+
+BUILDERS = {}
+
+_MAPPED = {}  # (root, name) -> table mapped by this process
+
+
+def register_table(name, build):
+    """
+    Makes a table buildable by name. `build` takes no arguments and returns
+    (columns, parameters): a dict of numpy arrays and a JSON-able dict
+    describing how they were produced.
+    """
+    BUILDERS[name] = build
+
+
+def _current_generation(table_dir):
+    try:
+        with open(os.path.join(table_dir, "CURRENT")) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def _publish_lock(table_dir):
+    """
+    Serializes publishers of one table so they never pick the same
+    generation or swap CURRENT back to an older one.
+    """
+    with open(os.path.join(table_dir, ".lock"), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def publish_table(name, columns, parameters=None, root=None):
+    """
+    Writes `columns` as a new generation of table `name` and makes it current.
+    Workers still reading the previous generation keep their mapping until
+    they next look the table up. Returns the new generation number.
+    """
+    table_dir = os.path.join(root or TABLE_DIR, name)
+    os.makedirs(table_dir, exist_ok=True)
+
+    # Write the generation under a temporary name so no reader sees it half written
+    staging = tempfile.mkdtemp(prefix=".staging.", dir=table_dir)
+    try:
+        os.chmod(staging, 0o755)  # mkdtemp is private to its owner; workers may run as another user
+        for column, values in columns.items():
+            np.save(os.path.join(staging, column + ".npy"), np.ascontiguousarray(values))
+        with open(os.path.join(staging, "parameters.json"), "w") as f:
+            json.dump(parameters or {}, f, sort_keys=True)
+
+        with _publish_lock(table_dir):
+            # Past every existing generation, even if CURRENT was lost or damaged
+            existing = [int(entry) for entry in os.listdir(table_dir) if entry.isdigit()]
+            generation = max(existing + [_current_generation(table_dir) or 0]) + 1
+            os.rename(staging, os.path.join(table_dir, str(generation)))
+
+            # Swap the pointer atomically
+            pointer = os.path.join(table_dir, f".CURRENT.{os.getpid()}")
+            with open(pointer, "w") as f:
+                f.write(str(generation))
+            os.replace(pointer, os.path.join(table_dir, "CURRENT"))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Mapped files stay readable after removal on POSIX; elsewhere removal may
+    # fail while a worker still has them open, and is retried on the next publish
+    for entry in os.listdir(table_dir):
+        if entry.isdigit() and int(entry) <= generation - KEEP_GENERATIONS:
+            shutil.rmtree(os.path.join(table_dir, entry), ignore_errors=True)
+    return generation
+
+
+def load_table(name, root=None):
+    """
+    Returns the current generation of table `name` as a dict with
+    'generation', 'parameters' and read-only memory-mapped 'columns', or None
+    if it has never been published or can't be read, so callers fall back to
+    computing the values themselves. The mapping is reused until a newer
+    generation is published.
+    """
+    root = root or TABLE_DIR
+    table_dir = os.path.join(root, name)
+    key = (root, name)
+    generation = _current_generation(table_dir)
+    while generation is not None:
+        table = _MAPPED.get(key)
+        if table is not None and table['generation'] == generation:
+            return table
+
+        generation_dir = os.path.join(table_dir, str(generation))
+        try:
+            with open(os.path.join(generation_dir, "parameters.json")) as f:
+                parameters = json.load(f)
+            columns = {entry[:-4]: np.load(os.path.join(generation_dir, entry), mmap_mode="r")
+                       for entry in os.listdir(generation_dir) if entry.endswith(".npy")}
+        except (OSError, ValueError, EOFError):
+            # Only retry if a newer publish pruned this generation while we
+            # were opening it; a missing or damaged generation stays unreadable
+            latest = _current_generation(table_dir)
+            if latest == generation:
+                break
+            generation = latest
+            continue
+
+        table = {'generation': generation, 'parameters': parameters, 'columns': columns}
+        _MAPPED[key] = table  # Dropping the old entry unmaps the old generation
+        return table
+
+    _MAPPED.pop(key, None)
+    return None
+
+
+def build_breakpoint_table(max_base_ammo=1000, max_bonus=500):
+    """
+    Max Ammo Bonus thresholds for every base ammo up to max_base_ammo, as used
+    by find_bonus_breakpoints. Base ammo A reaches max ammo A + k at
+    ammo_bonus[offsets[A - 1] + k - 1], for k up to offsets[A] - offsets[A - 1].
+    """
+    from streamlit_app import ENGINE_VERSION, apply_ammo_bonus_batch, solve_bonus_thresholds
+
+    base_ammo = np.arange(1, max_base_ammo + 1, dtype=np.int64)
+    counts = apply_ammo_bonus_batch(base_ammo, max_bonus) - base_ammo
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    owner = np.repeat(base_ammo, counts)
+    steps = np.arange(len(owner)) - offsets[owner - 1] + 1
+    columns = {
+        'offsets': offsets,
+        'ammo_bonus': solve_bonus_thresholds(owner, owner + steps),
+    }
+    parameters = {'engine_version': ENGINE_VERSION, 'max_base_ammo': max_base_ammo,
+                  'max_bonus': max_bonus}
+    return columns, parameters
+
+register_table("breakpoints", build_breakpoint_table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", default=TABLE_DIR, help="Directory the tables are published in")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build and publish a table")
+    build.add_argument("name", choices=list(BUILDERS))
+    commands.add_parser("list", help="Show the current generation of every published table")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        columns, parameters = BUILDERS[args.name]()
+        generation = publish_table(args.name, columns, parameters, root=args.root)
+        size = sum(values.nbytes for values in columns.values())
+        print(f"Published {args.name} generation {generation} ({size / 2**20:.1f} MiB)")
+        return 0
+
+    names = sorted(os.listdir(args.root)) if os.path.isdir(args.root) else []
+    for name in names:
+        table = load_table(name, root=args.root)
+        if table is not None:
+            size = sum(values.nbytes for values in table['columns'].values())
+            print(f"{name:<16}generation {table['generation']:<6}{size / 2**20:>8.1f} MiB  "
+                  f"{json.dumps(table['parameters'], sort_keys=True)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())